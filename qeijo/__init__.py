@@ -1,3 +1,3 @@
-from qeijo.pw import calc,out,PWException
+from qeijo.pw import calc,out,PWException,clear_cache
 
 __version__=0.1
\ No newline at end of file
@@ -1,7 +1,53 @@
 import subprocess as sp
-import io
 import os
+import re
+import mmap
+import array
 import shlex
+import pickle
+import hashlib
+import tempfile
+import numpy as np
+
+# Directory where parsed inputs and outputs are cached
+CACHE_DIR=os.path.join(os.environ.get("XDG_CACHE_HOME",os.path.join(os.path.expanduser("~"),
+                       ".cache")),"qeijo")
+# Bump whenever the layout of cached objects changes
+_CACHE_VERSION=8
+
+# Tokens of the namelists of the PW input: blanks, comments, namelist headers,
+# "key = value" assignments (quoted values may contain blanks, commas, "!" or 
+# doubled quotes), separating commas and the "/" closing a namelist
+_NAMELIST_TOKEN_RE=re.compile(r"""\s+|!.*|,|&(?P<namelist>\w+)|(?P<end>/)"""
+                              r"""|(?P<key>[A-Za-z_]\w*(?:\([^)]*\))?)\s*=\s*"""
+                              r"""(?P<value>'(?:[^']|'')*'|"(?:[^"]|"")*"|[^\s,!/]+)""")
+
+# Lowercase keywords opening the namelists and cards of the PW input, mapped 
+# to the attribute or the method that handles them
+_NAMELISTS={"&control":"control","&system":"system","&electrons":"electrons",
+            "&ions":"ions","&cell":"cell"}
+_CARDS={"cell_parameters":"__read_cell_parameters__",
+        "atomic_species":"__read_atomic_species__",
+        "atomic_positions":"__read_atomic_positions__",
+        "k_points":"__read_k_points__"}
+
+# Quantities in the PW output. Every pattern starts with a literal, so that the 
+# regex engine can skip through the output with a fast substring search; an 
+# alternation of all of them, or a "^[ \t]*" anchor, would be tried at every 
+# byte instead. The energy line is matched with its preceding newline, which 
+# keeps the literal prefix and leaves out the "!!" lines of hybrid functionals
+_ENERGY_RE=re.compile(rb"\n![ \t]+total energy[ \t]*=[ \t]*(\S+)")
+_FERMI_RE=re.compile(rb"the Fermi energy is[ \t]+(\S+)")
+_MAGNETIZATION_RE=re.compile(rb"total magnetization[ \t]*=[ \t]*(\S+)")
+_ABSMAGNETIZATION_RE=re.compile(rb"absolute magnetization[ \t]*=[ \t]*(\S+)")
+_NATOMS_RE=re.compile(rb"number of atoms/cell[ \t]*=[ \t]*(\d+)")
+_ALAT_RE=re.compile(rb"lattice parameter \(alat\)[ \t]*=[ \t]*(\S+)")
+
+# Headers of the blocks in the PW output of which only the last one is read
+_CRYSTAL_AXES=b"crystal axes:"
+_FORCES=b"Forces acting on atoms"
+_ATOMIC_POSITIONS=b"ATOMIC_POSITIONS"
+_TERMINATED=b"This run was terminated on"
 
 class calc:
    '''
@@ -81,6 +127,9 @@ class calc:
 
    read_input(inpfile) -> reads PW input file 'inpfile' and assigns values to 
        attributes.
+   read_output(outfile,savecoords,coordfile) -> reads an existing PW output 
+       file 'outfile', returning an 'out' object. If 'savecoords' is set to 
+       'True', last atomic coordinates will be saved into file 'coordfile'.
    build_input(saveinp,inpfile) -> returns PW input as a string. If 'saveinp' 
        is set to 'True', the input script will be saved into the file 'inpfile'.
    run(command_line,input_string,saveout,outfile,savecoords,coordfile) -> runs 
@@ -96,81 +145,82 @@ class calc:
       self.system["ntyp"]=str(len(self.atomic_species))
 
       # Build &CONTROL section
-      input_string="&CONTROL\n"
+      parts=["&CONTROL\n"]
 
       for key in self.control:
-         input_string+=key+" = "+str(self.control[key])+",\n"
+         parts.append(f"{key} = {self.control[key]},\n")
 
-      input_string+="/\n"
+      parts.append("/\n")
 
       # Build &SYSTEM section
-      input_string+="&SYSTEM\n"
+      parts.append("&SYSTEM\n")
 
       for key in self.system:
-         input_string+=key+" = "+str(self.system[key])+",\n"
+         parts.append(f"{key} = {self.system[key]},\n")
 
-      input_string+="/\n"
+      parts.append("/\n")
 
       # Build &ELECTRONS section
-      input_string+="&ELECTRONS\n"
+      parts.append("&ELECTRONS\n")
 
       for key in self.electrons:
-         input_string+=key+" = "+str(self.electrons[key])+",\n"
+         parts.append(f"{key} = {self.electrons[key]},\n")
 
-      input_string+="/\n"
+      parts.append("/\n")
 
       # Build &IONS section
-      input_string+="&IONS\n"
+      parts.append("&IONS\n")
 
       for key in self.ions:
-         input_string+=key+" = "+str(self.ions[key])+",\n"
+         parts.append(f"{key} = {self.ions[key]},\n")
 
-      input_string+="/\n"
+      parts.append("/\n")
 
       # Build &CELL section
       if self.control["calculation"]=="'vc-relax'" or self.control["calculation"]=="'vc-md'":
-         input_string+="&CELL\n"
+         parts.append("&CELL\n")
 
          for key in self.cell:
-            input_string+=key+" = "+str(self.cell[key])+",\n"
+            parts.append(f"{key} = {self.cell[key]},\n")
 
-         input_string+="/\n"
+         parts.append("/\n")
 
       # Build card ATOMIC_SPECIES   
-      input_string+="ATOMIC_SPECIES\n"
+      parts.append("ATOMIC_SPECIES\n")
       
-      for i in range(len(self.atomic_species)):
-         input_string+=self.atomic_species[i]+"   "+str(self.atomic_mass[i])+"   "+self.pseudopotential[i]+"\n"
+      for species,mass,pp in zip(self.atomic_species,self.atomic_mass,self.pseudopotential):
+         parts.append(f"{species}   {mass}   {pp}\n")
 
       # Build card CELL_PARAMETERS
       if int(self.system["ibrav"])==0:
-         input_string+="CELL_PARAMETERS "+self.cell_parameters_units+"\n"
-         input_string+=str(self.v1[0])+"   "+str(self.v1[1])+"   "+str(self.v1[2])+"\n"
-         input_string+=str(self.v2[0])+"   "+str(self.v2[1])+"   "+str(self.v2[2])+"\n"
-         input_string+=str(self.v3[0])+"   "+str(self.v3[1])+"   "+str(self.v3[2])+"\n"
+         parts.append("CELL_PARAMETERS "+self.cell_parameters_units+"\n")
+
+         for v in (self.v1,self.v2,self.v3):
+            parts.append(f"{v[0]}   {v[1]}   {v[2]}\n")
 
       # Build card ATOMIC_POSITIONS
-      input_string+="ATOMIC_POSITIONS "+self.atomic_positions_units+"\n"
+      parts.append("ATOMIC_POSITIONS "+self.atomic_positions_units+"\n")
 
-      for i in range(len(self.atom_type)):
-         if len(self.if_pos1)==0:
-            input_string+=self.atom_type[i]+"   "+str(self.x[i])+"   "+str(self.y[i])+"   "+str(self.z[i])+"\n"
-         else:
-            input_string+=self.atom_type[i]+"   "+str(self.x[i])+"   "+str(self.y[i])+"   "+str(self.z[i])+"   "+\
-            str(self.if_pos1[i])+"   "+str(self.if_pos2[i])+"   "+str(self.if_pos3[i])+"\n"
+      if len(self.if_pos1)==0:
+         parts.extend("{}   {}   {}   {}\n".format(*atom) for atom in 
+                      zip(self.atom_type,self.x,self.y,self.z))
+      else:
+         parts.extend("{}   {}   {}   {}   {}   {}   {}\n".format(*atom) for atom in 
+                      zip(self.atom_type,self.x,self.y,self.z,self.if_pos1,self.if_pos2,
+                          self.if_pos3))
 
       # Build card K_POINTS
-      input_string+="K_POINTS "+self.k_points_type+"\n"
+      parts.append("K_POINTS "+self.k_points_type+"\n")
       
       if self.k_points_type!="gamma":
          if self.k_points_type=="automatic":
-            input_string+=str(self.nk1)+"   "+str(self.nk2)+"   "+str(self.nk3)+"   "+str(self.sk1)+"   "+\
-            str(self.sk2)+"   "+str(self.sk3)+"\n"
+            parts.append(f"{self.nk1}   {self.nk2}   {self.nk3}   {self.sk1}   {self.sk2}   {self.sk3}\n")
          else:
-            input_string+=str(self.wk)+"\n"
+            parts.append(f"{len(self.wk)}\n")
+            parts.extend("{}   {}   {}   {}\n".format(*k) for k in 
+                         zip(self.kx,self.ky,self.kz,self.wk))
 
-            for i in range(len(self.wk)):
-               input_string+=str(self.kx[i])+"   "+str(self.ky[i])+"   "+str(self.kz[i])+"   "+str(self.wk[i])+"\n"
+      input_string="".join(parts)
 
       if saveinp:
          self.__write_input__(inpfile,input_string)
@@ -180,198 +230,86 @@ class calc:
       return input_string
 
    def read_input(self,inpfile="input"):
-      iscontrol=False
-      issystem=False
-      iselectrons=False
-      isions=False
-      iscell=False
-      iscellparameters=False
-      isatomicspecies=False
-      isatomicpositions=False
-      iskpoints=False
-
-      try:
-         f=open(inpfile,"r")
-      except FileNotFoundError:
+      if not os.path.isfile(inpfile):
          print("File not found!")
 
          return
 
-      lines=f.readlines()
-
-      j=0
+      parsed=_memoize(calc().__parse_input__,inpfile)
+      default=vars(calc())
 
-      for line in lines:
-         l=line.split()
+      # Values found in the input file override the current ones, namelists 
+      # being updated key by key
+      for key,value in vars(parsed).items():
+         if isinstance(value,dict):
+            getattr(self,key).update(value)
+         elif value!=default[key]:
+            setattr(self,key,value)
 
-         # Read &CONTROL section
-         if l[0].lower()=="&control":	
-            iscontrol=True
-         elif iscontrol:
-            if l[0]=="/":
-               iscontrol=False
-            else:
-               self.control[l[0]]=l[2].replace(",","")
-
-         # Read &SYSTEM section
-         elif l[0].lower()=="&system":
-            issystem=True
-         elif issystem:
-            if l[0]=="/":
-               issystem=False
-            else:
-               self.system[l[0]]=l[2].replace(",","")
-
-         # Read &ELECTRONS section
-         elif l[0].lower()=="&electrons":
-            iselectrons=True
-         elif iselectrons:
-            if l[0]=="/":
-               iselectrons=False
-            else:
-               self.electrons[l[0]]=l[2].replace(",","")
-
-         # Read &IONS section
-         elif l[0].lower()=="&ions":
-            isions=True
-         elif isions:
-            if l[0]=="/":
-               isions=False
-            else:
-               self.ions[l[0]]=l[2].replace(",","")
-
-         # Read &CELL section
-         elif l[0].lower()=="&cell":
-            iscell=True
-         elif iscell:
-            if l[0]=="/":
-               iscell=False
-            else:
-               self.cell[l[0]]=l[2].replace(",","")
-
-         # Read CELL_PARAMETERS card
-         elif l[0].lower()=="cell_parameters":
-            iscellparameters=True
-
-            if len(l)==2:
-               self.cell_parameters_units=l[1]
-
-         elif iscellparameters:
-            if j==0:            
-               self.v1.append(float(l[0]))
-               self.v1.append(float(l[1]))
-               self.v1.append(float(l[2]))
-
-               j=1            
-            elif j==1:
-               self.v2.append(float(l[0]))
-               self.v2.append(float(l[1]))
-               self.v2.append(float(l[2]))
-
-               j=2
-            elif j==2:
-               self.v3.append(float(l[0]))
-               self.v3.append(float(l[1]))
-               self.v3.append(float(l[2]))
-
-               j=0
-               iscellparameters=False
-
-         # Read ATOMIC_SPECIES card
-         elif l[0].lower()=="atomic_species":
-            isatomicspecies=True
-         elif isatomicspecies:
-            self.atomic_species.append(l[0])
-            self.atomic_mass.append(l[1])
-            self.pseudopotential.append(l[2])
-
-            j+=1
-
-            if j==int(self.system["ntyp"]):
-               j=0
-               isatomicspecies=False
-
-         # Read ATOMIC_POSITIONS card
-         elif l[0].lower()=="atomic_positions":
-            isatomicpositions=True
-
-            if len(l)==2:
-               self.atomic_positions_units=l[1]
-
-         elif isatomicpositions:
-            self.atom_type.append(l[0])
-            self.x.append(float(l[1]))
-            self.y.append(float(l[2]))        
-            self.z.append(float(l[3]))
-
-            if len(l)==7:
-               self.if_pos1.append(int(l[4])) 
-               self.if_pos2.append(int(l[5])) 
-               self.if_pos3.append(int(l[6]))
-
-            j+=1
-
-            if j==int(self.system["nat"]):
-               j=0
-               isatomicpositions=False
-
-         # Read K_POINTS card
-         elif l[0].lower()=="k_points":
-            self.k_points_type=l[1]
-
-            if self.k_points_type!="gamma":
-               iskpoints=True
-         elif iskpoints:
-            if self.k_points_type=="automatic":
-               self.nk1=int(l[0])
-               self.nk2=int(l[1])
-               self.nk3=int(l[2])
-               self.sk1=int(l[3])
-               self.sk2=int(l[4])
-               self.sk3=int(l[5])
-            else:
-               if j==0:
-                  nk=int(l[0])
-                  j=1
-               else:
-                  self.kx.append(float(l[0]))
-                  self.ky.append(float(l[1]))
-                  self.kz.append(float(l[2]))
-                  self.wk.append(float(l[3]))
-   
-                  j+=1
-
-                  if j>nk:
-                     iskpoints=False
-                     j=0
-   
       print("Done!")
 
       return
 
+   def read_output(self,outfile="output",savecoords=False,coordfile="coord.xyz"):
+      if not os.path.isfile(outfile):
+         raise PWException("File not found!")
+
+      pw_out_obj=_memoize(self.__get_output_info__,outfile)
+
+      print("Data collected from PW output!")
+
+      if savecoords:
+         self.__write_coords__(coordfile,pw_out_obj)
+
+      return pw_out_obj
+
    def run(self,command_line,input_string,saveout=False,outfile="output",
            savecoords=False,coordfile="coord.xyz"):
       args=shlex.split(command_line)  
-      pw=sp.Popen(args,stdin=sp.PIPE,stdout=sp.PIPE,stderr=sp.PIPE)
 
-      try:
-         input_bytes=bytes(input_string,"utf8")
-      except:
-          input_bytes=bytes(input_string)
+      # PW output goes straight to disk, so that it can be memory-mapped later
+      if saveout:
+         output=open(outfile,"wb")
+      else:
+         output=tempfile.NamedTemporaryFile(delete=False)
 
+      # Nothing but the input goes through a pipe; pw.x writes its output 
+      # itself, so no copy of it is ever held in memory
       try:
-         comm_pw=pw.communicate(input_bytes)
-         out=io.StringIO(comm_pw[0].decode())
-      except:
-         raise PWException("Error when launching pw.x!")
+         try:
+            pw=sp.Popen(args,stdin=sp.PIPE,stdout=output,stderr=sp.DEVNULL)
+
+            # As in communicate(), a process that exits without reading its 
+            # whole input is not a launch error
+            try:
+               self.__write_stdin__(pw.stdin,input_string)
+               pw.stdin.close()
+            except BrokenPipeError:
+               pass
+
+            returncode=pw.wait()
+         except:
+            raise PWException("Error when launching pw.x!")
+         finally:
+            output.close()
+
+         if os.path.isfile('CRASH'):
+            raise PWException("pw.x has crashed!")
+         else:
+            print("Calculation finished!")
 
-      if os.path.isfile('CRASH'):
-         raise PWException("pw.x has crashed!")
-      else:
-         print("Calculation finished!")
+         # A non-zero status is also returned by runs that did not converge, 
+         # whose results are still of interest
+         pw_out_obj=self.__get_output_info__(output.name)
+         pw_out_obj.returncode=returncode
+      finally:
+         if not saveout:
+            os.remove(output.name)
 
-      pw_out_obj=self.__get_output_info__(out,saveout,outfile,savecoords,
-                                          coordfile)
+      print("Data collected from PW output!")
+
+      if savecoords:
+         self.__write_coords__(coordfile,pw_out_obj)
 
       return pw_out_obj
 
@@ -381,11 +319,21 @@ class calc:
 
    __write_input__(inpfile,input_string) -> writes PW input in 'input_string' 
        into file 'inpfile'.
-   __get_output_info__(output,saveout,outfile,savecoords,coordfile) -> retrieves 
-       information from the output of a PW calculation to be stored in an 'out' 
-       object. If 'saveout' is set to 'True', the output will be saved into file 
-       'outfile'. If 'savecoords' is set to 'True', last atomic coordinates will 
-       be saved into 'coordfile'. 
+   __read_cell_parameters__(lines,n), __read_atomic_species__(lines,n), 
+   __read_atomic_positions__(lines,n), __read_k_points__(lines,n) -> parse the 
+       card whose header is 'lines[n]', returning the number of lines consumed.
+   __write_stdin__(stdin,input_string,chunk) -> writes PW input in 
+       'input_string' (either str or bytes) to the pipe 'stdin', encoding a str 
+       'chunk' characters at a time.
+   __read_block__(lines,start,nrows,usecols,dtype) -> parses 'nrows' lines of a 
+       card, starting at index 'start' of 'lines', into a 2D NumPy array.
+   __parse_input__(inpfile) -> parses PW input file 'inpfile' into the 
+       attributes, returning the object itself.
+   __get_output_info__(outfile) -> retrieves information from the output of a 
+       PW calculation in file 'outfile' to be stored in an 'out' object.
+   __next_lines__(buf,pos,nlines,skipblank) -> returns the whitespace-split 
+       tokens of the 'nlines' lines following the one containing offset 'pos' in 
+       'buf', optionally skipping blank lines.
    __write_coords__(coordfile,pw_out_obj) -> write last system coordinates taken from PW output stored 
       in the 'out' object 'pw_out_obj' into file 'outfile'.
    '''
@@ -397,163 +345,281 @@ class calc:
 
       return
 
-   def __get_output_info__(self,output,saveout=False,outfile="output",savecoords=False,coordfile="coord.xyz"):
+   def __parse_input__(self,inpfile):
+      namelist=None
+      pos=0
+
+      f=open(inpfile,"r")
+      text=f.read()
+      f.close()
+
+      # Tokenize the namelists; the first text that is not part of a namelist 
+      # marks the beginning of the cards
+      while True:
+         m=_NAMELIST_TOKEN_RE.match(text,pos)
+
+         if m is None:
+            if namelist is not None:
+               raise PWException("Unexpected text in namelist at offset %d of '%s'!" % 
+                                 (pos,inpfile))
+
+            break
+
+         pos=m.end()
+
+         if m.group("namelist") is not None:
+            attr=_NAMELISTS.get("&"+m.group("namelist").lower())
+            namelist=getattr(self,attr) if attr is not None else dict()
+         elif m.group("key") is not None:
+            if namelist is not None:
+               namelist[m.group("key")]=m.group("value")
+         elif m.group("end") is not None:
+            namelist=None
+
+      lines=text[pos:].splitlines(keepends=True)
+      skip=0
+
+      for n,line in enumerate(lines):
+         # Skip the lines of a card already parsed as a block
+         if skip>0:
+            skip-=1
+
+            continue
+
+         l=line.split()
+
+         if len(l)==0:
+            continue
+
+         key=l[0].lower()
+
+         if key in _CARDS:
+            skip=getattr(self,_CARDS[key])(lines,n)
+
+      return self
+
+   def __read_cell_parameters__(self,lines,n):
+      l=lines[n].split()
+
+      if len(l)==2:
+         self.cell_parameters_units=l[1]
+
+      cellpar=self.__read_block__(lines,n+1,3,usecols=(0,1,2))
+      self.v1=cellpar[0].tolist()
+      self.v2=cellpar[1].tolist()
+      self.v3=cellpar[2].tolist()
+
+      return 3
+
+   def __read_atomic_species__(self,lines,n):
+      ntyp=int(self.system["ntyp"])
+
+      for line in lines[n+1:n+1+ntyp]:
+         l=line.split()
+         self.atomic_species.append(l[0])
+         self.atomic_mass.append(l[1])
+         self.pseudopotential.append(l[2])
+
+      return ntyp
+
+   def __read_atomic_positions__(self,lines,n):
+      l=lines[n].split()
+
+      if len(l)==2:
+         self.atomic_positions_units=l[1]
+
+      nat=int(self.system["nat"])
+      rows=[line.split("!")[0].split("#")[0].split() for line in lines[n+1:n+1+nat]]
+      self.atom_type=[row[0] for row in rows]
+      pos=self.__read_block__(lines,n+1,nat,usecols=(1,2,3))
+      self.x=pos[:,0].tolist()
+      self.y=pos[:,1].tolist()
+      self.z=pos[:,2].tolist()
+
+      if len(rows)>0 and len(rows[0])==7:
+         if_pos=self.__read_block__(lines,n+1,nat,usecols=(4,5,6),dtype=int)
+         self.if_pos1=if_pos[:,0].tolist()
+         self.if_pos2=if_pos[:,1].tolist()
+         self.if_pos3=if_pos[:,2].tolist()
+
+      return nat
+
+   def __read_k_points__(self,lines,n):
+      self.k_points_type=lines[n].split()[1].strip("{}()")
+
+      if self.k_points_type=="gamma":
+         return 0
+      elif self.k_points_type=="automatic":
+         grid=self.__read_block__(lines,n+1,1,usecols=range(6),dtype=int)[0]
+         self.nk1,self.nk2,self.nk3,self.sk1,self.sk2,self.sk3=grid.tolist()
+
+         return 1
+      else:
+         nk=int(lines[n+1].split()[0])
+         kpts=self.__read_block__(lines,n+2,nk,usecols=(0,1,2,3))
+         self.kx=kpts[:,0].tolist()
+         self.ky=kpts[:,1].tolist()
+         self.kz=kpts[:,2].tolist()
+         self.wk=kpts[:,3].tolist()
+
+         return nk+1
+
+   def __write_stdin__(self,stdin,input_string,chunk=1<<20):
+      # A str input is encoded slice by slice, so that no full encoded copy 
+      # of it is ever built
+      if isinstance(input_string,str):
+         for i in range(0,len(input_string),chunk):
+            stdin.write(input_string[i:i+chunk].encode("utf8"))
+      else:
+         stdin.write(input_string)
+
+      return
+
+   def __read_block__(self,lines,start,nrows,usecols=None,dtype=float):
+      # loadtxt takes the list of lines as is, without joining them into a 
+      # single string first; trailing comments are allowed on card lines
+      return np.loadtxt(lines[start:start+nrows],usecols=usecols,dtype=dtype,ndmin=2,
+                        comments=("!","#"))
+
+   def __get_output_info__(self,outfile="output"):
       ry2ev=13.605
       bohr2angs=0.529177
-      nextcellpar=False
-      nextcoords=False
-      nextforces=False
-      i=0
-      j=0
       a0=None
       t=[]
-      x=[]
-      y=[]
-      z=[]
-      fx=[]
-      fy=[]
-      fz=[]
-      v1=[]
-      v2=[]
-      v3=[]
+      pos=np.empty((0,3))
+      forces=np.empty((0,3))
+      cell=np.zeros((3,3))
       natoms=None
-      energy=[]
-      magnetization=[]
-      absmagnetization=[]
+      energy=np.empty(0)
+      magnetization=array.array("d")
+      absmagnetization=array.array("d")
       efermi=None
       jobdone=False
 
-      lines=output.readlines()
+      f=open(outfile,"rb")
 
-      if saveout:
-         f=open(outfile,"w")
-
-      for line in lines:
-         if saveout:
-            f.write(line)
-
-         l=line.rstrip().split()
-
-         if len(l)>=5 and l[0]=="!":
-            energy.append(float(l[4])*ry2ev)
-         elif len(l)>=5 and l[0].lower()=="the" and l[1].lower()=="fermi" and l[2].lower()=="energy":
-            efermi=float(l[4])
-         elif len(l)>=4 and l[1]=="magnetization":
-            if l[0]=="total":
-               try:
-                  magnetization.append(float(l[3]))
-               except:
-                  pass
-            elif l[0]=="absolute":
-               try:
-                  absmagnetization.append(float(l[3]))
-               except:
-                  pass
-         elif len(l)>=5 and l[0].lower()=="lattice" and l[1].lower()=="parameter": 
-            a0=float(l[4])*bohr2angs
-         elif len(l)>=5 and l[0].lower()=="number" and l[1].lower()=="of":
-            if l[2].lower()=="atoms/cell":
-               natoms=int(l[4])           
-         elif len(l)>=2 and l[0].lower()=="crystal" and l[1].lower()=="axes:":
-            nextcellpar=True
-            v1=[]
-            v2=[]
-            v3=[]
-         elif nextcellpar:
-            if i==0:
-               v1.append(float(l[3])*a0)
-               v1.append(float(l[4])*a0)
-               v1.append(float(l[5])*a0)
-            elif i==1:
-               v2.append(float(l[3])*a0)
-               v2.append(float(l[4])*a0)
-               v2.append(float(l[5])*a0)
-            elif i==2:
-               v3.append(float(l[3])*a0)
-               v3.append(float(l[4])*a0)
-               v3.append(float(l[5])*a0)
-
-               nextcellpar=False
-            
-            i+=1
-         elif len(l)>=7 and l[0].lower()=="forces" and l[1].lower()=="acting" \
-         and l[2].lower()=="on" and l[3].lower()=="atoms":
-            nextforces=True
-            fx=[]
-            fy=[]
-            fz=[]
-            j=0
-         elif nextforces:
-            if len(l)>0:
-               fx.append(float(l[6])*ry2ev/bohr2angs)
-               fy.append(float(l[7])*ry2ev/bohr2angs)
-               fz.append(float(l[8])*ry2ev/bohr2angs)
-
-               j+=1
-
-               if j==natoms:
-                  j=0
-                  nextforces=False
-         elif len(l)>=1 and l[0].lower()=="atomic_positions":
-            nextcoords=True
-            t=[]
-            x=[]
-            y=[]
-            z=[]
-            j=0
-         elif nextcoords:
-            t.append(l[0])
-            x.append(float(l[1]))
-            y.append(float(l[2]))
-            z.append(float(l[3]))
-     
-            j+=1
-   
-            if j==natoms:
-               j=0
-               nextcoords=False
-         elif len(l)>=5 and l[3].lower()=="terminated":
-             jobdone=True
-   
-      print("Data collected from PW output!")
+      # An empty file cannot be memory-mapped
+      if os.fstat(f.fileno()).st_size>0:
+         buf=mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ)
+      else:
+         buf=b""
+
+      try:
+         # Energies are converted from the matched bytes in one go, while the
+         # magnetizations, which may fail to convert, are kept unboxed
+         energy=[m.group(1) for m in _ENERGY_RE.finditer(buf)]
+
+         # A first line has no newline before it
+         if buf[:1]==b"!":
+            end=buf.find(b"\n")
+            m=_ENERGY_RE.match(b"\n"+buf[:end if end!=-1 else len(buf)])
+
+            if m is not None:
+               energy.insert(0,m.group(1))
+
+         energy=np.array(energy,dtype=np.float64)
+         energy*=ry2ev
+
+         for m in _FERMI_RE.finditer(buf):
+            efermi=float(m.group(1))
+
+         for m in _MAGNETIZATION_RE.finditer(buf):
+            try:
+               magnetization.append(float(m.group(1)))
+            except ValueError:
+               pass
+
+         for m in _ABSMAGNETIZATION_RE.finditer(buf):
+            try:
+               absmagnetization.append(float(m.group(1)))
+            except ValueError:
+               pass
+
+         for m in _NATOMS_RE.finditer(buf):
+            natoms=int(m.group(1))
+
+         # Block headers are located with a backward substring search
+         axesheader=buf.rfind(_CRYSTAL_AXES)
+         forcesheader=buf.rfind(_FORCES)
+         coordsheader=buf.rfind(_ATOMIC_POSITIONS)
+
+         if axesheader!=-1:
+            # The lattice parameter printed before the cell vectors
+            m=_ALAT_RE.search(buf,max(buf.rfind(b"lattice parameter",0,axesheader),0))
+
+            if m is not None:
+               a0=float(m.group(1))*bohr2angs
+
+            rows=self.__next_lines__(buf,axesheader,3)
+
+            # A block cut short, e.g. by a killed run, leaves the defaults
+            if len(rows)==3 and all(len(l)>=6 for l in rows):
+               cell=np.array([l[3:6] for l in rows],dtype=np.float64)
+               cell*=a0
+
+         if forcesheader!=-1 and natoms is not None:
+            rows=self.__next_lines__(buf,forcesheader,natoms,skipblank=True)
+
+            if len(rows)==natoms and all(len(l)>=9 for l in rows):
+               forces=np.array([l[6:9] for l in rows],dtype=np.float64).reshape(-1,3)
+               forces*=ry2ev/bohr2angs
+
+         if coordsheader!=-1 and natoms is not None:
+            rows=self.__next_lines__(buf,coordsheader,natoms)
+
+            if len(rows)==natoms and all(len(l)>=4 for l in rows):
+               t=[l[0].decode() for l in rows]
+               pos=np.array([l[1:4] for l in rows],dtype=np.float64).reshape(-1,3)
+
+         jobdone=buf.find(_TERMINATED)!=-1
+      finally:
+         if isinstance(buf,mmap.mmap):
+            buf.close()
 
-      if saveout:
          f.close()
 
       pw_out_obj=out()
       pw_out_obj.atom_type=t
-      pw_out_obj.x=x
-      pw_out_obj.y=y
-      pw_out_obj.z=z
-      pw_out_obj.fx=fx
-      pw_out_obj.fy=fy
-      pw_out_obj.fz=fz
-      pw_out_obj.v1=v1
-      pw_out_obj.v2=v2
-      pw_out_obj.v3=v3
+      pw_out_obj.pos=pos
+      pw_out_obj.forces=forces
+      pw_out_obj.cell=cell
       pw_out_obj.energy=energy
-      pw_out_obj.magnetization=magnetization
-      pw_out_obj.absmagnetization=absmagnetization
+      pw_out_obj.magnetization=np.array(magnetization,dtype=np.float64)
+      pw_out_obj.absmagnetization=np.array(absmagnetization,dtype=np.float64)
       pw_out_obj.efermi=efermi
       pw_out_obj.jobdone=jobdone
 
-      if savecoords:
-         self.__write_coords__(coordfile,pw_out_obj)
-
       return pw_out_obj
 
-   def __write_coords__(self,coordfile,pw_out_obj):
-      g=open(coordfile,"w")
+   def __next_lines__(self,buf,pos,nlines,skipblank=False):
+      rows=[]
+      pos=buf.find(b"\n",pos)+1
+
+      while len(rows)<nlines and 0<pos<len(buf):
+         end=buf.find(b"\n",pos)
+
+         if end==-1:
+            end=len(buf)
 
-      g.write("%d\n" % len(pw_out_obj.atom_type))
-      g.write('Lattice="%.6f %.6f %.6f %.6f %.6f %.6f %.6f %.6f %.6f" Properties=species:S:1:pos:R:3\n' \
-      % (pw_out_obj.v1[0],pw_out_obj.v1[1],pw_out_obj.v1[2],pw_out_obj.v2[0],pw_out_obj.v2[1],\
-      pw_out_obj.v2[2],pw_out_obj.v3[0],pw_out_obj.v3[1],pw_out_obj.v3[2]))
+         l=buf[pos:end].split()
+         pos=end+1
 
-      for i in range(len(pw_out_obj.atom_type)):
-         g.write("%s %.6f %.6f %.6f\n" % (pw_out_obj.atom_type[i],pw_out_obj.x[i],pw_out_obj.y[i],\
-         pw_out_obj.z[i]))
+         if len(l)>0 or not skipblank:
+            rows.append(l)
 
+      return rows
+
+   def __write_coords__(self,coordfile,pw_out_obj):
+      # The whole extended XYZ frame is formatted first and written at once
+      parts=["%d\n" % len(pw_out_obj.atom_type),
+             'Lattice="%.6f %.6f %.6f %.6f %.6f %.6f %.6f %.6f %.6f" Properties=species:S:1:pos:R:3\n' \
+             % tuple(pw_out_obj.cell.ravel())]
+      parts.extend("%s %.6f %.6f %.6f\n" % (t,x,y,z) for t,(x,y,z) in zip(pw_out_obj.atom_type,
+                   pw_out_obj.pos.tolist()))
+
+      g=open(coordfile,"w")
+
+      g.write("".join(parts))
       g.close()
 
       print("Coordinates saved!")
@@ -570,36 +636,103 @@ class out:
    -----------
 
    atom_type -> list associating each atom to its atomic species.
-   x,y,z -> lists containing the final cartesian positions of the atoms (Ang).
-   fx,fy,fz -> list containing the final forces acting on atoms (ev/Ang).
-   v1,v2,v3 -> cell vectors (units of lattice parameter).
-   energy -> list containing the total energy of the system after every scf step (eV).
+   pos -> (N,3) array containing the final cartesian positions of the atoms 
+      (Ang).
+   forces -> (N,3) array containing the final forces acting on atoms (ev/Ang).
+   cell -> (3,3) array whose rows are the cell vectors (Ang).
+   x,y,z -> read-only views of the columns of 'pos'.
+   fx,fy,fz -> read-only views of the columns of 'forces'.
+   v1,v2,v3 -> read-only views of the rows of 'cell'.
+   energy -> array containing the total energy of the system after every scf step (eV).
    efermi -> Fermi energy (eV).
-   magnetization -> list containing the total magnetization of the system after 
+   magnetization -> array containing the total magnetization of the system after 
       every scf step (Bohr magneton).
-   absmagnetization -> list containing the absolute magnetization of the system
+   absmagnetization -> array containing the absolute magnetization of the system
       after every scf step (Bohr magneton).
    jobdone -> a flag that is 'True' if the calculation finished properly or
       otherwise 'False'.   
+   returncode -> exit status of pw.x (e.g., 2 if the scf did not converge, 3 if
+      the maximum number of ionic steps was reached), or 'None' if the object 
+      was not returned by 'calc.run()'.
       
    The attributes are initialized in the class constructor:   
    '''
    def __init__(self):
       self.atom_type=[]
-      self.x=[]
-      self.y=[]
-      self.z=[]
-      self.fx=[]
-      self.fy=[]
-      self.fz=[]
-      self.v1=[]
-      self.v2=[]
-      self.v3=[]
-      self.energy=[]
+      self.pos=np.empty((0,3))
+      self.forces=np.empty((0,3))
+      self.cell=np.zeros((3,3))
+      self.energy=np.empty(0)
       self.efermi=None
-      self.magnetization=[]
-      self.absmagnetization=[]
+      self.magnetization=np.empty(0)
+      self.absmagnetization=np.empty(0)
       self.jobdone=False
+      self.returncode=None
+
+   x=property(lambda self: self.pos[:,0])
+   y=property(lambda self: self.pos[:,1])
+   z=property(lambda self: self.pos[:,2])
+   fx=property(lambda self: self.forces[:,0])
+   fy=property(lambda self: self.forces[:,1])
+   fz=property(lambda self: self.forces[:,2])
+   v1=property(lambda self: self.cell[0])
+   v2=property(lambda self: self.cell[1])
+   v3=property(lambda self: self.cell[2])
+
+def clear_cache():
+   '''
+   clear_cache() -> removes every parsed input and output stored in CACHE_DIR.
+   '''
+   if os.path.isdir(CACHE_DIR):
+      for cachefile in os.listdir(CACHE_DIR):
+         if cachefile.endswith(".pkl"):
+            os.remove(os.path.join(CACHE_DIR,cachefile))
+
+def _memoize(parse,path):
+   '''
+   _memoize(parse,path) -> returns 'parse(path)', loading it from CACHE_DIR
+      if the file 'path' was already parsed and has not changed since. The cache
+      key hashes the path, size, modification time and the first and last 64 KiB
+      of the file.
+   '''
+   chunk=1<<16
+   st=os.stat(path)
+   h=hashlib.blake2b(digest_size=20)
+
+   h.update(("%s %s %d %d %d" % (parse.__name__,os.path.abspath(path),st.st_size,
+             st.st_mtime_ns,_CACHE_VERSION)).encode())
+
+   with open(path,"rb") as f:
+      h.update(f.read(chunk))
+      f.seek(max(st.st_size-chunk,0))
+      h.update(f.read(chunk))
+
+   cachefile=os.path.join(CACHE_DIR,h.hexdigest()+".pkl")
+
+   try:
+      with open(cachefile,"rb") as f:
+         return pickle.load(f)
+   except Exception:
+      pass
+
+   result=parse(path)
+
+   # A cache that cannot be written is simply not used
+   try:
+      os.makedirs(CACHE_DIR,exist_ok=True)
+      f=tempfile.NamedTemporaryFile(dir=CACHE_DIR,delete=False)
+   except OSError:
+      return result
+
+   try:
+      with f:
+         pickle.dump(result,f,protocol=pickle.HIGHEST_PROTOCOL)
+
+      os.replace(f.name,cachefile)
+   except (OSError,pickle.PicklingError):
+      os.remove(f.name)
+
+   return result
 
 class PWException(Exception):
    '''
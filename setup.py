@@ -8,7 +8,8 @@ setup(name='qeijo',
       version='0.1',
       description="Lightweight library to easily launch ab initio calculations with Quantum Espresso.",
       long_description=read('Readme.MD'),
-      requires=['subprocess','io','os','shlex','exceptions'],
+      python_requires='>=3.7',
+      install_requires=['numpy>=1.20'],
       author='Roberto Gomes de Aguiar Veiga',
       url="https://github.com/rgaveiga/qeijo",
       packages=['qeijo'])